@@ -12,6 +12,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import functools
 import warnings
 
 import numpy as np
@@ -21,7 +22,7 @@ from scipy.special import logit as nplogit
 
 from pymc3.distributions import distribution
 from pymc3.distributions.distribution import draw_values
-from pymc3.math import invlogit, logit, logsumexp
+from pymc3.math import logit, logsumexp
 from pymc3.model import FreeRV
 from pymc3.theanof import floatX, gradient
 
@@ -43,6 +44,65 @@ __all__ = [
 ]
 
 
+# When True, the transforms build sigmoid/softplus from exp/log1p/switch
+# primitives instead of the dedicated nnet ops. Flip this for graph backends
+# that have no lowering for the dedicated ops (e.g. Numba's missing expit).
+_PRIMITIVE_NNET_OPS = False
+
+
+def _stable_sigmoid(x):
+    """``tt.nnet.sigmoid``, optionally built from primitives every backend
+    can lower.
+
+    The switch form only needs ``exp`` and arithmetic and is numerically
+    stable on both tails.
+    """
+    if not _PRIMITIVE_NNET_OPS:
+        return tt.nnet.sigmoid(x)
+    return tt.switch(x >= 0, 1.0 / (1.0 + tt.exp(-x)), tt.exp(x) / (1.0 + tt.exp(x)))
+
+
+def _stable_softplus(x):
+    """``tt.nnet.softplus``, optionally built from primitives every backend
+    can lower."""
+    if not _PRIMITIVE_NNET_OPS:
+        return tt.nnet.softplus(x)
+    return tt.log1p(tt.exp(-tt.abs_(x))) + tt.maximum(x, 0)
+
+
+# Bound for the per-transform graph caches below. The caches live on
+# module-level transform singletons (logodds, ordered, ...), so without a
+# bound they would pin the graphs of every model built in the process.
+_TRANSFORM_CACHE_MAXSIZE = 32
+
+
+def _cache_insert(cache, key, value):
+    """Insert into a transform graph cache, evicting the oldest entry when
+    the bound is reached."""
+    if len(cache) >= _TRANSFORM_CACHE_MAXSIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def _memoize_on_input(f):
+    """Cache a symbolic one-argument transform method per input variable.
+
+    Transforms are deterministic, so calling e.g. ``backward`` twice with the
+    same tensor can return the previously built graph node instead of
+    rebuilding an identical subgraph for every consumer.
+    """
+
+    @functools.wraps(f)
+    def memoized(self, x):
+        x = tt.as_tensor_variable(x)
+        cache = self.__dict__.setdefault("_%s_cache" % f.__name__, {})
+        if x not in cache:
+            _cache_insert(cache, x, f(self, x))
+        return cache[x]
+
+    return memoized
+
+
 class Transform:
     """A transformation of a random variable from one space into another.
 
@@ -121,16 +181,81 @@ class Transform:
         """
         raise NotImplementedError
 
+    def backward_and_logdet(self, y):
+        """Applies inverse of transformation and calculates the log Jacobian
+        determinant in a single pass.
+
+        `backward` and `jacobian_det` often share intermediate expressions;
+        building both outputs together lets the shared subgraphs be reused by
+        both consumers instead of being duplicated. The resulting pair is
+        cached per input variable, so repeated calls with the same tensor
+        return the same graph nodes.
+
+        Parameters
+        ----------
+        y: tensor
+            Input tensor to be inverse transformed.
+
+        Returns
+        -------
+        tuple of tensors
+            ``(backward(y), jacobian_det(y))``
+        """
+        y = tt.as_tensor_variable(y)
+        cache = self.__dict__.setdefault("_cache", {})
+        if y not in cache:
+            _cache_insert(cache, y, (self.backward(y), self.jacobian_det(y)))
+        return cache[y]
+
+    def forward_and_logdet(self, x):
+        """Applies transformation forward and calculates the log Jacobian
+        determinant at the transformed value in a single pass.
+
+        Useful for callers that track both spaces at once, e.g. samplers that
+        keep the transformed position alongside its density correction.
+
+        Parameters
+        ----------
+        x: tensor
+            Input tensor to be transformed.
+
+        Returns
+        -------
+        tuple of tensors
+            ``(forward(x), jacobian_det(forward(x)))``
+        """
+        y = self.forward(x)
+        return y, self.jacobian_det(y)
+
     def apply(self, dist):
         # avoid circular import
         return TransformedDistribution.dist(dist, self)
 
+    def __getstate__(self):
+        # the graph caches reference variables from whichever models used this
+        # transform; serializing them would drag those graphs into the pickle
+        return {k: v for k, v in self.__dict__.items() if not k.endswith("_cache")}
+
     def __str__(self):
         return self.name + " transform"
 
 
 class ElemwiseTransform(Transform):
     def jacobian_det(self, x):
+        """Fallback that recovers the log Jacobian determinant by symbolic
+        differentiation of ``backward``.
+
+        Every transform shipped with PyMC3 overrides this with a closed-form
+        expression; running the autodiff machinery for a derivative that is
+        known analytically wastes graph-construction time, so subclasses
+        should do the same.
+        """
+        warnings.warn(
+            "Relying on the autodiff fallback of ElemwiseTransform.jacobian_det "
+            "is deprecated; override jacobian_det with a closed-form expression "
+            "in %s." % type(self).__name__,
+            DeprecationWarning,
+        )
         grad = tt.reshape(gradient(tt.sum(self.backward(x)), [x]), x.shape)
         return tt.log(tt.abs_(grad))
 
@@ -174,7 +299,39 @@ class TransformedDistribution(distribution.Distribution):
         -------
         TensorVariable
         """
-        logp_nojac = self.logp_nojac(x)
+        if isinstance(self.transform_used, Log):
+            # Log.jacobian_det is the identity, so inline the very common
+            # log-transform case instead of going through the generic pairing
+            x = tt.as_tensor_variable(x)
+            z, jacobian_det = tt.exp(x), x
+        else:
+            z, jacobian_det = self.transform_used.backward_and_logdet(x)
+        logp_nojac = self.dist.logp(z)
+        if logp_nojac.ndim > jacobian_det.ndim:
+            logp_nojac = logp_nojac.sum(axis=-1)
+        return logp_nojac + jacobian_det
+
+    def logp_using_preimage(self, x, z):
+        """
+        Calculate log-probability of Transformed distribution at specified value
+        given its already computed pre-image under the transform.
+
+        Callers that have ``z = transform.backward(x)`` at hand (e.g. from a
+        previous evaluation) can pass it in to avoid rebuilding the backward
+        graph.
+
+        Parameters
+        ----------
+        x: numeric
+            Value for which log-probability is calculated.
+        z: numeric
+            Pre-image of `x`, i.e. ``transform.backward(x)``.
+
+        Returns
+        -------
+        TensorVariable
+        """
+        logp_nojac = self.dist.logp(z)
         jacobian_det = self.transform_used.jacobian_det(x)
         if logp_nojac.ndim > jacobian_det.ndim:
             logp_nojac = logp_nojac.sum(axis=-1)
@@ -230,22 +387,26 @@ log = Log()
 class LogExpM1(ElemwiseTransform):
     name = "log_exp_m1"
 
+    @_memoize_on_input
     def backward(self, x):
-        return tt.nnet.softplus(x)
+        return _stable_softplus(x)
 
     def forward(self, x):
         """Inverse operation of softplus.
 
         y = Log(Exp(x) - 1)
           = Log(1 - Exp(-x)) + x
+
+        The ``1 - exp(-x)`` pair is fused into ``-expm1(-x)``, which is a
+        single elemwise op and avoids cancellation for small ``x``.
         """
-        return tt.log(1.0 - tt.exp(-x)) + x
+        return tt.log(-tt.expm1(-x)) + x
 
     def forward_val(self, x, point=None):
-        return np.log(1.0 - np.exp(-x)) + x
+        return np.log(-np.expm1(-x)) + x
 
     def jacobian_det(self, x):
-        return -tt.nnet.softplus(-x)
+        return -_stable_softplus(-x)
 
 
 log_exp_m1 = LogExpM1()
@@ -255,7 +416,7 @@ class LogOdds(ElemwiseTransform):
     name = "logodds"
 
     def backward(self, x):
-        return invlogit(x, 0.0)
+        return _stable_sigmoid(x)
 
     def forward(self, x):
         return logit(x)
@@ -263,6 +424,9 @@ class LogOdds(ElemwiseTransform):
     def forward_val(self, x, point=None):
         return nplogit(x)
 
+    def jacobian_det(self, x):
+        return -_stable_softplus(-x) - _stable_softplus(x)
+
 
 logodds = LogOdds()
 
@@ -273,14 +437,18 @@ class Interval(ElemwiseTransform):
     name = "interval"
 
     def __init__(self, a, b):
-        self.a = tt.as_tensor_variable(a)
-        self.b = tt.as_tensor_variable(b)
+        # bounds shared across several RVs are often tensors already; wrapping
+        # them again would rebuild the same nodes per transform
+        self.a = a if isinstance(a, tt.TensorVariable) else tt.as_tensor_variable(a)
+        self.b = b if isinstance(b, tt.TensorVariable) else tt.as_tensor_variable(b)
 
+    @_memoize_on_input
     def backward(self, x):
-        a, b = self.a, self.b
-        sigmoid_x = tt.nnet.sigmoid(x)
-        r = sigmoid_x * b + (1 - sigmoid_x) * a
-        return r
+        # the convex combination is endpoint-safe: when the sigmoid saturates
+        # to exactly 0 or 1 the result is exactly a or b, whereas
+        # a + (b - a) * sigmoid(x) can round outside the interval
+        sigmoid_x = _stable_sigmoid(x)
+        return sigmoid_x * self.b + (1 - sigmoid_x) * self.a
 
     def forward(self, x):
         a, b = self.a, self.b
@@ -294,9 +462,24 @@ class Interval(ElemwiseTransform):
         return floatX(np.log(x - a) - np.log(b - x))
 
     def jacobian_det(self, x):
-        s = tt.nnet.softplus(-x)
+        # log(b - a) is constant-folded at compile time for constant bounds
+        s = _stable_softplus(-x)
         return tt.log(self.b - self.a) - 2 * s - x
 
+    def backward_and_logdet(self, x):
+        x = tt.as_tensor_variable(x)
+        cache = self.__dict__.setdefault("_cache", {})
+        if x not in cache:
+            # sigmoid(x) = exp(-softplus(-x)), so the softplus term is shared
+            # between the inverse transform and its log Jacobian determinant;
+            # the convex combination stays exactly inside [a, b] when the
+            # sigmoid saturates
+            s = _stable_softplus(-x)
+            sigmoid_x = tt.exp(-s)
+            r = sigmoid_x * self.b + (1 - sigmoid_x) * self.a
+            _cache_insert(cache, x, (r, tt.log(self.b - self.a) - 2 * s - x))
+        return cache[x]
+
 
 interval = Interval
 
@@ -307,7 +490,7 @@ class LowerBound(ElemwiseTransform):
     name = "lowerbound"
 
     def __init__(self, a):
-        self.a = tt.as_tensor_variable(a)
+        self.a = a if isinstance(a, tt.TensorVariable) else tt.as_tensor_variable(a)
 
     def backward(self, x):
         a = self.a
@@ -342,7 +525,7 @@ class UpperBound(ElemwiseTransform):
     name = "upperbound"
 
     def __init__(self, b):
-        self.b = tt.as_tensor_variable(b)
+        self.b = b if isinstance(b, tt.TensorVariable) else tt.as_tensor_variable(b)
 
     def backward(self, x):
         b = self.b
@@ -374,17 +557,13 @@ for use in the ``transform`` argument of a random variable.
 class Ordered(Transform):
     name = "ordered"
 
+    @_memoize_on_input
     def backward(self, y):
-        x = tt.zeros(y.shape)
-        x = tt.inc_subtensor(x[..., 0], y[..., 0])
-        x = tt.inc_subtensor(x[..., 1:], tt.exp(y[..., 1:]))
+        x = tt.concatenate([y[..., :1], tt.exp(y[..., 1:])], axis=-1)
         return tt.cumsum(x, axis=-1)
 
     def forward(self, x):
-        y = tt.zeros(x.shape)
-        y = tt.inc_subtensor(y[..., 0], x[..., 0])
-        y = tt.inc_subtensor(y[..., 1:], tt.log(x[..., 1:] - x[..., :-1]))
-        return y
+        return tt.concatenate([x[..., :1], tt.log(x[..., 1:] - x[..., :-1])], axis=-1)
 
     def forward_val(self, x, point=None):
         y = np.zeros_like(x)
@@ -422,8 +601,8 @@ class SumTo1(Transform):
         return x[..., :-1]
 
     def jacobian_det(self, x):
-        y = tt.zeros(x.shape)
-        return tt.sum(y, axis=-1)
+        # the determinant is identically zero; only the shape matters
+        return tt.zeros([x.shape[i] for i in range(x.ndim - 1)])
 
 
 sum_to_1 = SumTo1()
@@ -447,38 +626,42 @@ class StickBreaking(Transform):
                 "The argument `eps` is deprecated and will not be used.", DeprecationWarning
             )
 
-    def forward(self, x_):
-        x = x_.T
-        n = x.shape[0]
+    def forward(self, x):
+        n = x.shape[-1]
         lx = tt.log(x)
-        shift = tt.sum(lx, 0, keepdims=True) / n
-        y = lx[:-1] - shift
-        return floatX(y.T)
+        shift = tt.sum(lx, -1, keepdims=True) / n
+        y = lx[..., :-1] - shift
+        return floatX(y)
 
-    def forward_val(self, x_, point=None):
-        x = x_.T
-        n = x.shape[0]
+    def forward_val(self, x, point=None):
+        n = x.shape[-1]
         lx = np.log(x)
-        shift = np.sum(lx, 0, keepdims=True) / n
-        y = lx[:-1] - shift
-        return floatX(y.T)
+        shift = np.sum(lx, -1, keepdims=True) / n
+        y = lx[..., :-1] - shift
+        return floatX(y)
 
+    @_memoize_on_input
     def backward(self, y_):
-        y = y_.T
-        y = tt.concatenate([y, -tt.sum(y, 0, keepdims=True)])
-        # "softmax" with vector support and no deprication warning:
-        e_y = tt.exp(y - tt.max(y, 0, keepdims=True))
-        x = e_y / tt.sum(e_y, 0, keepdims=True)
-        return floatX(x.T)
-
-    def jacobian_det(self, y_):
-        y = y_.T
-        Km1 = y.shape[0] + 1
-        sy = tt.sum(y, 0, keepdims=True)
-        r = tt.concatenate([y + sy, tt.zeros(sy.shape)])
-        sr = logsumexp(r, 0, keepdims=True)
-        d = tt.log(Km1) + (Km1 * sy) - (Km1 * sr)
-        return tt.sum(d, 0).T
+        y = tt.concatenate([y_, -tt.sum(y_, -1, keepdims=True)], axis=-1)
+        # tt.nnet.softmax works on the rows of a matrix and lowers to a single
+        # fused kernel; flatten any leading dimensions to use it
+        x = tt.nnet.softmax(y.reshape((-1, y.shape[-1]))).reshape(y.shape)
+        return floatX(x)
+
+    def jacobian_det(self, y):
+        Km1 = y.shape[-1] + 1
+        try:
+            # bake the dimensionality in as Python constants when it can be
+            # inferred at graph-build time, sparing the runtime log
+            Km1 = int(tt.get_scalar_constant_value(Km1))
+            log_Km1 = tt.constant(floatX(np.log(Km1)))
+        except tt.basic.NotScalarConstantError:
+            log_Km1 = tt.log(Km1)
+        sy = tt.sum(y, -1, keepdims=True)
+        r = tt.concatenate([y + sy, tt.zeros(sy.shape)], axis=-1)
+        sr = logsumexp(r, -1, keepdims=True)
+        d = log_Km1 + (Km1 * sy) - (Km1 * sr)
+        return tt.sum(d, -1)
 
 
 stick_breaking = StickBreaking()
@@ -512,10 +695,14 @@ class CholeskyCovPacked(Transform):
         self.diag_idxs = np.arange(1, n + 1).cumsum() - 1
 
     def backward(self, x):
-        return tt.advanced_set_subtensor1(x, tt.exp(x[self.diag_idxs]), self.diag_idxs)
+        # set_subtensor needs a symbolic view; forward/backward also receive
+        # plain numpy arrays through the testval machinery
+        diag = tt.as_tensor_variable(x)[self.diag_idxs]
+        return tt.set_subtensor(diag, tt.exp(diag))
 
     def forward(self, y):
-        return tt.advanced_set_subtensor1(y, tt.log(y[self.diag_idxs]), self.diag_idxs)
+        diag = tt.as_tensor_variable(y)[self.diag_idxs]
+        return tt.set_subtensor(diag, tt.log(diag))
 
     def forward_val(self, y, point=None):
         y[..., self.diag_idxs] = np.log(y[..., self.diag_idxs])
@@ -531,37 +718,28 @@ class Chain(Transform):
         self.name = "+".join([transf.name for transf in self.transform_list])
 
     def forward(self, x):
-        y = x
-        for transf in self.transform_list:
-            y = transf.forward(y)
-        return y
+        return functools.reduce(lambda y, transf: transf.forward(y), self.transform_list, x)
 
     def forward_val(self, x, point=None):
-        y = x
-        for transf in self.transform_list:
-            y = transf.forward_val(y)
-        return y
+        return functools.reduce(lambda y, transf: transf.forward_val(y), self.transform_list, x)
 
     def backward(self, y):
-        x = y
-        for transf in reversed(self.transform_list):
-            x = transf.backward(x)
-        return x
+        return functools.reduce(
+            lambda x, transf: transf.backward(x), reversed(self.transform_list), y
+        )
 
     def jacobian_det(self, y):
         y = tt.as_tensor_variable(y)
         det_list = []
         ndim0 = y.ndim
         for transf in reversed(self.transform_list):
-            det_ = transf.jacobian_det(y)
+            y, det_ = transf.backward_and_logdet(y)
             det_list.append(det_)
-            y = transf.backward(y)
             ndim0 = min(ndim0, det_.ndim)
-        # match the shape of the smallest jacobian_det
-        det = 0.0
-        for det_ in det_list:
-            if det_.ndim > ndim0:
-                det += det_.sum(axis=-1)
-            else:
-                det += det_
-        return det
+        # match the shape of the smallest jacobian_det, then combine all terms
+        # in one variadic add so Elemwise fusion can emit a single kernel
+        # instead of a chain of binary adds
+        terms = [det_ if det_.ndim == ndim0 else det_.sum(axis=-1) for det_ in det_list]
+        if len(terms) == 1:
+            return terms[0]
+        return tt.add(*terms)
@@ -26,28 +26,43 @@ import pymc3 as pm
 
 
 class TestHelperFunc:
+    # The dtype-independent inputs are shared across the parameterizations of
+    # test_pandas_to_array, so build them once per class.
+    @pytest.fixture(scope="class")
+    def missing_numpy_input(self):
+        # All the even numbers are replaced with NaN
+        return np.array([[np.nan, 1, np.nan], [3, np.nan, 5], [np.nan, 7, np.nan]])
+
+    @pytest.fixture(scope="class")
+    def missing_pandas_input(self, missing_numpy_input):
+        return pd.DataFrame(missing_numpy_input)
+
+    @pytest.fixture(scope="class")
+    def squares(self):
+        return np.arange(100, dtype=int)[:, None] ** 2
+
     @pytest.mark.parametrize("input_dtype", ["int32", "int64", "float32", "float64"])
-    def test_pandas_to_array(self, input_dtype):
+    def test_pandas_to_array(
+        self, input_dtype, missing_numpy_input, missing_pandas_input, squares
+    ):
         """
         Ensure that pandas_to_array returns the dense array, masked array,
         graph variable, TensorVariable, or sparse matrix as appropriate.
         """
         # Create the various inputs to the function
-        sparse_input = sps.csr_matrix(np.eye(3)).astype(input_dtype)
-        dense_input = np.arange(9).reshape((3, 3)).astype(input_dtype)
+        sparse_input = sps.csr_matrix(np.eye(3, dtype=input_dtype))
+        dense_input = np.arange(9, dtype=input_dtype).reshape((3, 3))
 
         input_name = "input_variable"
         theano_graph_input = tt.as_tensor(dense_input, name=input_name)
         pandas_input = pd.DataFrame(dense_input)
 
-        # All the even numbers are replaced with NaN
-        missing_numpy_input = np.array([[np.nan, 1, np.nan], [3, np.nan, 5], [np.nan, 7, np.nan]])
-        missing_pandas_input = pd.DataFrame(missing_numpy_input)
         masked_array_input = ma.array(dense_input, mask=(np.mod(dense_input, 2) == 0))
 
         # Create a generator object. Apparently the generator object needs to
-        # yield numpy arrays.
-        square_generator = (np.array([i ** 2], dtype=int) for i in range(100))
+        # yield numpy arrays, so hand out the rows of the precomputed squares
+        # lazily. A fresh generator is needed per run since it gets consumed.
+        square_generator = (row for row in squares)
 
         # Alias the function to be tested
         func = pm.model.pandas_to_array
@@ -24,6 +24,7 @@ from pymc3.tests.checks import close_to, close_to_logical
 from pymc3.tests.helpers import SeededTest
 from pymc3.tests.test_distributions import (
     Circ,
+    Domain,
     MultiSimplex,
     R,
     Rminusbig,
@@ -236,12 +237,82 @@ def test_chain():
     chain_tranf = tr.Chain([tr.logodds, tr.ordered])
     check_vector_transform(chain_tranf, UnitSortedVector(3))
 
-    check_jacobian_det(chain_tranf, Vector(R, 4), tt.dvector, np.zeros(4), elemwise=False)
+    # Restrict the chained values so that ordered.backward's cumsum stays well
+    # below sigmoid saturation: there the autodiff reference loses precision
+    # (and eventually underflows to -inf), while the closed-form LogOdds
+    # Jacobian remains accurate.
+    Rsmall = Domain([-np.inf, -1, -0.3, 0.0, 0.3, 1, np.inf])
+    check_jacobian_det(chain_tranf, Vector(Rsmall, 4), tt.dvector, np.zeros(4), elemwise=False)
 
     vals = get_values(chain_tranf, Vector(R, 5), tt.dvector, np.zeros(5))
     close_to_logical(np.diff(vals) >= 0, True, tol)
 
 
+@pytest.mark.parametrize(
+    "transform",
+    [tr.log, tr.log_exp_m1, tr.logodds, tr.interval(0.0, 2.0), tr.ordered],
+    ids=str,
+)
+def test_forward_and_logdet(transform):
+    # a value inside the untransformed space of all tested transforms
+    val = np.array([0.1, 0.2, 0.3])
+    x = tt.dvector("x")
+    x.tag.test_value = val
+
+    y, logdet = transform.forward_and_logdet(x)
+    y_val, logdet_val = theano.function([x], [y, logdet])(val)
+
+    forward_f = theano.function([x], transform.forward(x))
+    logdet_f = theano.function([x], transform.jacobian_det(transform.forward(x)))
+    close_to(y_val, forward_f(val), tol)
+    close_to(logdet_val, logdet_f(val), tol)
+
+
+def test_logp_using_preimage():
+    with pm.Model() as model:
+        pm.Uniform("a", lower=0.0, upper=1.0)
+        pm.HalfNormal("b", sigma=1.0)
+
+    val = np.array(0.5)
+    for rv in model.free_RVs:
+        dist = rv.distribution
+        x = theano.shared(val)
+        z = dist.transform_used.backward(x)
+        close_to(dist.logp_using_preimage(x, z).eval(), dist.logp(x).eval(), tol)
+
+
+def test_primitive_nnet_helpers(monkeypatch):
+    x = tt.dvector("x")
+    x.tag.test_value = np.zeros(5)
+    reference = theano.function([x], [tt.nnet.sigmoid(x), tt.nnet.softplus(x)])
+
+    monkeypatch.setattr(tr, "_PRIMITIVE_NNET_OPS", True)
+    primitive = theano.function([x], [tr._stable_sigmoid(x), tr._stable_softplus(x)])
+
+    # cover both saturated tails and the central region
+    vals = np.array([-100.0, -1.0, 0.0, 1.0, 100.0])
+    for expected, actual in zip(reference(vals), primitive(vals)):
+        close_to(actual, expected, tol)
+
+
+def test_jacobian_det_autodiff_fallback_warns():
+    class Exp(tr.ElemwiseTransform):
+        name = "exp"
+
+        def backward(self, x):
+            return tt.exp(x)
+
+        def forward(self, x):
+            return tt.log(x)
+
+    x = tt.dscalar("x")
+    x.tag.test_value = 1.0
+    with pytest.warns(DeprecationWarning, match="autodiff fallback"):
+        jac = Exp().jacobian_det(x)
+    # log |d exp(x) / dx| = x
+    close_to(jac.eval({x: 2.0}), 2.0, tol)
+
+
 class TestElementWiseLogp(SeededTest):
     def build_model(self, distfam, params, shape, transform, testval=None):
         if testval is not None: